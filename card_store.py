@@ -0,0 +1,54 @@
+from typing import Optional, Dict, List
+from pathlib import Path
+import hashlib
+import orjson
+import sqlite3
+import threading
+
+class CardStore:
+    """SQLite-backed store of generated cards, keyed by the SHA-1 of the expression.
+
+    Methods block on disk I/O, so async callers should run them with asyncio.to_thread.
+    """
+
+    def __init__(self, path: str = ".card_cache/cards.db"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # The connection is shared by worker threads, one at a time
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("CREATE TABLE IF NOT EXISTS cards (key TEXT PRIMARY KEY, card TEXT NOT NULL)")
+        self._db.commit()
+
+    @staticmethod
+    def key(expression: str) -> str:
+        return hashlib.sha1(expression.encode()).hexdigest()
+
+    def get(self, expression: str) -> Optional[Dict]:
+        """Return the stored card for an expression, if any."""
+        return self.get_many([expression]).get(expression)
+
+    def get_many(self, expressions: List[str]) -> Dict[str, Dict]:
+        """Return the stored cards for the expressions that have one."""
+        keys = {self.key(expression): expression for expression in expressions}
+        if not keys:
+            return {}
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, card FROM cards WHERE key IN ({', '.join('?' * len(keys))})",
+                list(keys)
+            ).fetchall()
+        return {keys[key]: orjson.loads(card) for key, card in rows}
+
+    def set(self, expression: str, card: Dict):
+        """Store the card for an expression, replacing any previous one."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cards (key, card) VALUES (?, ?)",
+                (self.key(expression), orjson.dumps(card).decode())
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,14 +1,92 @@
-from typing import Optional, Dict, List
-from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple, Any, AsyncIterator, Awaitable, Callable, Final
+from dataclasses import dataclass, asdict
+from collections import OrderedDict
 import os
+import uuid
+import logging
+import orjson
 import asyncio
+import random
+import httpx
+import aiofiles
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from rate_limiter import TokenBucket
+from card_store import CardStore
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+# Local copies of card images, served by the web app under /static/img
+IMAGE_DIR = Path("static/img")
+# Image types kept locally, by Content-Type; lookups only check these names instead of scanning IMAGE_DIR
+IMAGE_SUFFIXES = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+# Unsplash asks for these on every link back to it
+UNSPLASH_UTM = "utm_source=anki-card-agent&utm_medium=referral"
+
+# Static prompt parts are sent byte-identical on every call, so OpenAI can cache the prompt prefix;
+# only the short per-expression templates are formatted per call. The worked examples keep
+# _TEXT_SYSTEM above the 1024-token minimum OpenAI needs before it caches a prefix.
+_TEXT_SYSTEM: Final[str] = """You are an expert American English teacher. You know American English pronunciation, give natural examples like a native speaker and explain vocabulary clearly to learners.
+
+You will be given one or more English expressions, labeled Q[1], Q[2], ... Q[N]. For each expression provide:
+1. phonetic: its IPA phonetic transcription in American English, e.g. "/həˈloʊ/"
+2. examples: 3 natural, conversational examples using the expression. Examples should:
+- Use everyday situations
+- Show different contexts
+- Include informal dialogue
+- Demonstrate the expression's typical usage
+3. explanation: the meaning of the expression in simple terms. The explanation should:
+- Be clear and concise
+- Use simple language
+- Include key usage notes if relevant
+- Be suitable for English learners
+- Be 1-2 sentences long
+
+Format: a JSON object with the keys "A[1]".."A[N]", where "A[i]" answers Q[i] and is an object with the keys "phonetic" (string), "examples" (list of strings) and "explanation" (string).
+
+Example 1 input:
+Q[1]: "hello"
+Q[2]: "break the ice"
+
+Example 1 output:
+{"A[1]": {"phonetic": "/həˈloʊ/", "examples": ["Hello! Long time no see, how have you been?", "She picked up the phone and said hello, but nobody answered.", "Say hello to your mom for me, okay?"], "explanation": "A friendly word you say when you meet someone or answer the phone."}, "A[2]": {"phonetic": "/breɪk ði aɪs/", "examples": ["I told a silly joke just to break the ice at the party.", "Our team lunch really helped break the ice with the new guy.", "Nobody was talking, so I asked about her dog to break the ice."], "explanation": "To say or do something that makes people feel more relaxed when they first meet. It is often used about parties, meetings and first dates."}}
+
+Example 2 input:
+Q[1]: "anticipate"
+Q[2]: "cavity"
+Q[3]: "run out of"
+
+Example 2 output:
+{"A[1]": {"phonetic": "/ænˈtɪsəˌpeɪt/", "examples": ["We didn't anticipate so many people showing up, so we ran out of chairs.", "I'm anticipating a lot of traffic tonight, so let's leave early.", "Honestly, I never anticipated she'd say yes to the trip!"], "explanation": "To expect something to happen and often get ready for it. It is a bit more formal than 'expect' and is common at work and in the news."}, "A[2]": {"phonetic": "/ˈkævəti/", "examples": ["The dentist said I have a cavity, so I need a filling next week.", "Stop eating so much candy or you'll end up with cavities.", "My son was so proud he had no cavities at his checkup."], "explanation": "A small hole in a tooth caused by decay. It can also mean any empty space inside something, like a body cavity."}, "A[3]": {"phonetic": "/rʌn aʊt ʌv/", "examples": ["Can you grab some milk? We ran out of it this morning.", "I ran out of time and couldn't finish the last question.", "My phone is about to run out of battery, so I'll text you later."], "explanation": "To use all of something so that none is left. It is usually followed by the thing that is finished, like time, money or food."}}
+
+Example 3 input:
+Q[1]: "under the weather"
+Q[2]: "nevertheless"
+Q[3]: "reluctant"
+
+Example 3 output:
+{"A[1]": {"phonetic": "/ˈʌndər ðə ˈwɛðər/", "examples": ["I'm feeling a little under the weather, so I'll skip the gym today.", "Jake's under the weather and won't make it to practice.", "You sound under the weather. Do you want me to bring you some soup?"], "explanation": "Slightly sick or not feeling well. It is an informal and polite way to say you are ill, usually not seriously."}, "A[2]": {"phonetic": "/ˌnɛvərðəˈlɛs/", "examples": ["It was raining hard. Nevertheless, we went for a walk.", "I know it's expensive, but I want to try it nevertheless.", "The test was tough; nevertheless, most of us passed."], "explanation": "In spite of what was just said. It connects two ideas that contrast and sounds more formal than 'but' or 'still'."}, "A[3]": {"phonetic": "/rɪˈlʌktənt/", "examples": ["He was reluctant to lend me his car, but he finally said yes.", "I'm a little reluctant to try sushi, to be honest.", "She seemed reluctant to talk about her old job."], "explanation": "Not wanting to do something and hesitating before doing it. It is often followed by 'to' and a verb, as in 'reluctant to leave'."}}
+
+Example 4 input:
+Q[1]: "by the way"
+Q[2]: "figure out"
+
+Example 4 output:
+{"A[1]": {"phonetic": "/baɪ ðə weɪ/", "examples": ["By the way, did you ever call the landlord back?", "Oh, by the way, Sarah says hi.", "Great job today. By the way, are you free for lunch tomorrow?"], "explanation": "Used to bring up a new topic or add extra information in a conversation. It is very common in speech and in texts, often shortened to 'BTW'."}, "A[2]": {"phonetic": "/ˈfɪɡjər aʊt/", "examples": ["I can't figure out how to turn on this new TV.", "Don't worry, we'll figure it out together.", "It took me a while to figure out what she really meant."], "explanation": "To understand something or find the answer to a problem by thinking about it. It is informal and very common in everyday speech."}}"""
+
+_TEXT_USER_TMPL: Final[str] = 'Q[{index}]: "{expression}"'
+
+_IMG_PROMPT_TMPL: Final[str] = """Simple clean illustration of the concept "{expression}".
+Style requirements:
+- Clean lines and simple shapes
+- No text or words
+- White background"""
+
 @dataclass
 class AnkiCard:
     expression: str
@@ -16,97 +94,371 @@ class AnkiCard:
     usage_examples: List[str]
     explanation: str
     image_url: Optional[str] = None
+    # Photographer credit, required when image_url hotlinks an Unsplash photo
+    image_credit: Optional[str] = None
+    image_credit_url: Optional[str] = None
 
 class EnglishLearningAgent:
-    def __init__(self):
-        """Initialize the English Learning Agent with necessary API keys."""
-        self.openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    TEXT_MODEL = "gpt-4o-mini"
+    TEXT_TEMPERATURE = 0.5
+    # Phonetic ~30, explanation ~80 and examples ~60 tokens plus the JSON keys
+    TEXT_MAX_TOKENS_PER_EXPRESSION = 200
+    
+    def __init__(
+        self,
+        max_concurrent: int = 20,
+        max_requests_per_minute: float = 3000,
+        max_tokens_per_minute: float = 200000,
+        max_attempts: int = 5,
+        text_cache_size: int = 4096,
+        store_path: str = ".card_cache/cards.db"
+    ):
+        """Initialize the English Learning Agent with necessary API keys and rate limits."""
+        # Share one HTTP/2 connection pool across all OpenAI calls so bursts reuse warm connections
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=100),
+            timeout=httpx.Timeout(60.0)
+        )
+        # Retries are left to _call_openai, so every attempt goes through the rate limits
+        self.openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=self._http, max_retries=0)
+        self._unsplash_access_key = os.getenv('UNSPLASH_ACCESS_KEY')
+        
+        # Keep bursts of parallel requests under the OpenAI rate limits instead of running into 429s
+        self.max_attempts = max_attempts
+        self._sem = asyncio.Semaphore(max_concurrent)
+        self._rpm_bucket = TokenBucket(max_requests_per_minute)
+        self._tpm_bucket = TokenBucket(max_tokens_per_minute)
+        
+        # Card text is cached per instance, which lives for the whole app in main.py
+        self._text_cache: OrderedDict[tuple, Dict] = OrderedDict()
+        self._text_cache_size = text_cache_size
+        
+        # Complete cards survive restarts, so known expressions never hit the API again
+        self._store = CardStore(store_path)
+        
+        # Cards being generated, so concurrent requests for the same expression share one pipeline
+        self._inflight: Dict[str, Tuple["asyncio.Future[Optional[Dict]]", "asyncio.Future[AnkiCard]"]] = {}
+    
+    async def aclose(self):
+        """Close the underlying HTTP connection pool and the card store."""
+        await self._http.aclose()
+        await asyncio.to_thread(self._store.close)
     
     async def generate_anki_card(self, expression: str) -> AnkiCard:
         """Generate an Anki card for the given English expression."""
-        # Run all requests in parallel
-        pronunciation_task = self._get_pronunciation(expression)
-        explanation_task = self._generate_explanation(expression)
-        examples_task = self._generate_usage_examples(expression)
-        image_task = self._find_relevant_image(expression)
-        
-        # Wait for all tasks to complete
-        pronunciation_info, explanation, examples, image_url = await asyncio.gather(
-            pronunciation_task,
-            explanation_task,
-            examples_task,
-            image_task
+        stored_card = await self._load_card(expression)
+        if stored_card is not None:
+            return stored_card
+        
+        _, card_task = self._start_cards([expression])[0]
+        return await asyncio.shield(card_task)
+    
+    async def stream_anki_card(self, expression: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """Generate an Anki card, yielding its text and then its image as soon as each is ready."""
+        stored_card = await self._load_card(expression)
+        if stored_card is not None:
+            yield "text", {
+                "phonetic": stored_card.phonetic,
+                "examples": stored_card.usage_examples,
+                "explanation": stored_card.explanation
+            }
+            yield "image", self._image_event(stored_card)
+            return
+        
+        # The text is usually ready long before the image
+        text_task, card_task = self._start_cards([expression])[0]
+        yield "text", await asyncio.shield(text_task) or self._fallback_text_bundle(expression)
+        
+        card = await asyncio.shield(card_task)
+        yield "image", self._image_event(card)
+    
+    @staticmethod
+    def _image_event(card: AnkiCard) -> Dict:
+        return {
+            "image_url": card.image_url,
+            "image_credit": card.image_credit,
+            "image_credit_url": card.image_credit_url
+        }
+    
+    def _start_cards(
+        self,
+        expressions: List[str],
+        batch_size: int = 10
+    ) -> List[Tuple["asyncio.Future[Optional[Dict]]", "asyncio.Future[AnkiCard]"]]:
+        """Start generating cards, joining the generation already in flight for any of the expressions."""
+        # Callers only await shielded tasks, so a client going away doesn't cancel the others
+        new_expressions = [expression for expression in dict.fromkeys(expressions) if expression not in self._inflight]
+        
+        # The text comes from batched requests of at most batch_size expressions, which run
+        # in parallel so long lists don't wait on one huge completion; images are generated per card
+        for i in range(0, len(new_expressions), batch_size):
+            batch = new_expressions[i:i + batch_size]
+            batch_task = asyncio.ensure_future(self._generate_text_bundles(batch))
+            
+            for index, expression in enumerate(batch):
+                text_task = asyncio.ensure_future(self._batch_item(batch_task, index))
+                card_task = asyncio.ensure_future(self._build_card(expression, text_task))
+                card_task.add_done_callback(lambda _, expression=expression: self._inflight.pop(expression, None))
+                self._inflight[expression] = (text_task, card_task)
+        
+        return [self._inflight[expression] for expression in expressions]
+    
+    @staticmethod
+    async def _batch_item(batch_task: "asyncio.Future[List[Optional[Dict]]]", index: int) -> Optional[Dict]:
+        return (await batch_task)[index]
+    
+    async def _build_card(self, expression: str, text_task: "asyncio.Future[Optional[Dict]]") -> AnkiCard:
+        """Finish a card from its text request, running the image request in parallel."""
+        text_bundle, image = await asyncio.gather(
+            text_task,
+            self._find_relevant_image(expression)
         )
         
+        card = self._make_card(expression, text_bundle, image)
+        if text_bundle is not None and self._is_storable(card):
+            await asyncio.to_thread(self._store.set, expression, asdict(card))
+        return card
+    
+    def _make_card(self, expression: str, text_bundle: Optional[Dict], image: Optional[Dict]) -> AnkiCard:
+        """Assemble a card, with placeholder text if its text request failed."""
+        text_bundle = text_bundle or self._fallback_text_bundle(expression)
         return AnkiCard(
             expression=expression,
-            phonetic=pronunciation_info["phonetic"],
-            usage_examples=examples,
-            explanation=explanation,
-            image_url=image_url
+            phonetic=text_bundle["phonetic"],
+            usage_examples=text_bundle["examples"],
+            explanation=text_bundle["explanation"],
+            **(image or {})
         )
     
-    async def _get_pronunciation(self, expression: str) -> Dict[str, str]:
-        """Get pronunciation details using GPT model."""
-        prompt = f"""For the English expression "{expression}", provide its IPA phonetic transcription in American English:
-        Format your response exactly like this example:
-        IPA: /həˈloʊ/
-        """
+    async def generate_anki_cards(self, expressions: List[str], batch_size: int = 10) -> List[AnkiCard]:
+        """Generate Anki cards for several expressions, sharing one GPT call per batch for the text."""
+        stored_cards = await asyncio.to_thread(self._store.get_many, expressions)
+        cards = {expression: AnkiCard(**card) for expression, card in stored_cards.items()}
+        missing = [expression for expression in dict.fromkeys(expressions) if expression not in cards]
+        
+        if missing:
+            card_tasks = [card_task for _, card_task in self._start_cards(missing, batch_size)]
+            new_cards = await asyncio.gather(*(asyncio.shield(card_task) for card_task in card_tasks))
+            cards.update(zip(missing, new_cards))
+        
+        return [cards[expression] for expression in expressions]
+    
+    async def _load_card(self, expression: str) -> Optional[AnkiCard]:
+        """Load a previously generated card from the persistent store."""
+        stored_card = await asyncio.to_thread(self._store.get, expression)
+        return AnkiCard(**stored_card) if stored_card is not None else None
+    
+    @staticmethod
+    def _is_storable(card: AnkiCard) -> bool:
+        """Whether a card's image will still work later: a local copy or an Unsplash hotlink, not a DALL-E URL."""
+        return bool(card.image_url and (card.image_url.startswith("/static/img/") or card.image_credit))
+    
+    @staticmethod
+    def _local_image_path(expression: str) -> Optional[Path]:
+        """Return the downloaded image for an expression, whatever its file type, if there is one."""
+        key = CardStore.key(expression)
+        return next(
+            (path for path in (IMAGE_DIR / f"{key}{suffix}" for suffix in IMAGE_SUFFIXES.values()) if path.exists()),
+            None
+        )
+    
+    async def _call_openai(self, create: Callable[..., Awaitable[Any]], **request: Any) -> Any:
+        """Call an OpenAI endpoint within the rate limits, retrying rate limits and transient errors with backoff."""
+        for attempt in range(1, self.max_attempts + 1):
+            await self._rpm_bucket.acquire()
+            await self._tpm_bucket.acquire(self._estimate_tokens(request))
+            
+            try:
+                async with self._sem:
+                    return await create(**request)
+            except (APIConnectionError, APIStatusError) as e:
+                if attempt == self.max_attempts or not self._is_retryable(e):
+                    raise
+                # Jitter keeps callers that failed together from retrying in lockstep
+                await asyncio.sleep(2 ** attempt * random.uniform(0.5, 1.5))
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Whether an OpenAI error is transient, matching the SDK's own retry policy."""
+        # APITimeoutError is an APIConnectionError
+        if isinstance(error, APIConnectionError):
+            return True
+        return isinstance(error, APIStatusError) and (error.status_code in (408, 409, 429) or error.status_code >= 500)
+    
+    @staticmethod
+    def _estimate_tokens(request: Dict) -> int:
+        """Roughly estimate the tokens a request uses, counting ~4 characters per prompt token."""
+        prompt_chars = sum(len(message["content"]) for message in request.get("messages", []))
+        return prompt_chars // 4 + request.get("max_tokens", 0)
+    
+    async def _generate_text_bundles(self, expressions: List[str]) -> List[Optional[Dict]]:
+        """Get the card text for one or more expressions, calling GPT only for uncached ones; None where it failed."""
+        text_bundles = {expression: self._text_cache_get(expression) for expression in expressions}
+        missing = [expression for expression, text_bundle in text_bundles.items() if text_bundle is None]
+        
+        if missing:
+            for expression, text_bundle in zip(missing, await self._request_text_bundles(missing)):
+                if text_bundle is not None:
+                    self._text_cache_set(expression, text_bundle)
+                text_bundles[expression] = text_bundle
+        
+        return [text_bundles[expression] for expression in expressions]
+    
+    async def _request_text_bundles(self, expressions: List[str]) -> List[Optional[Dict]]:
+        """Get the card text for one or more expressions in a single GPT call, None where it failed."""
+        # Only the expressions change between calls, so they go last to keep the prompt prefix cacheable
+        user_tail = "\n".join(
+            _TEXT_USER_TMPL.format(index=i, expression=expression) for i, expression in enumerate(expressions, 1)
+        )
         
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._call_openai(
+                self.openai_client.chat.completions.create,
+                model=self.TEXT_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a linguistics expert specializing in American English pronunciation."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": _TEXT_SYSTEM},
+                    {"role": "user", "content": user_tail}
                 ],
-                temperature=0.3
+                response_format={"type": "json_object"},
+                temperature=self.TEXT_TEMPERATURE,
+                max_tokens=self.TEXT_MAX_TOKENS_PER_EXPRESSION * len(expressions)
             )
             
-            # Parse the response
-            lines = response.choices[0].message.content.strip().split('\n')
-            pronunciation_data = {}
+            data = orjson.loads(response.choices[0].message.content)
+            return [
+                self._parse_text_bundle(data.get(f"A[{i}]"))
+                for i in range(1, len(expressions) + 1)
+            ]
             
-            for line in lines:
-                if line.startswith('IPA:'):
-                    pronunciation_data['phonetic'] = line.replace('IPA:', '').strip()
+        except Exception:
+            logger.exception("Error generating card text for %r", expressions)
+            return [None] * len(expressions)
+    
+    def _text_cache_get(self, expression: str) -> Optional[Dict]:
+        """Look up cached card text, marking it as recently used."""
+        key = (self.TEXT_MODEL, self.TEXT_TEMPERATURE, expression)
+        if key not in self._text_cache:
+            return None
+        self._text_cache.move_to_end(key)
+        return self._text_cache[key]
+    
+    def _text_cache_set(self, expression: str, text_bundle: Dict):
+        """Cache card text, evicting the least recently used entry when full."""
+        self._text_cache[(self.TEXT_MODEL, self.TEXT_TEMPERATURE, expression)] = text_bundle
+        if len(self._text_cache) > self._text_cache_size:
+            self._text_cache.popitem(last=False)
+    
+    @staticmethod
+    def _parse_text_bundle(data: Any) -> Optional[Dict]:
+        """Check a JSON answer has the requested shape, returning None if it doesn't."""
+        if not isinstance(data, dict):
+            return None
+        
+        phonetic, examples, explanation = data.get("phonetic"), data.get("examples"), data.get("explanation")
+        if not (
+            isinstance(phonetic, str) and phonetic
+            and isinstance(explanation, str) and explanation
+            and isinstance(examples, list) and examples
+            and all(isinstance(example, str) for example in examples)
+        ):
+            return None
+        
+        return {"phonetic": phonetic, "examples": examples, "explanation": explanation}
+    
+    @staticmethod
+    def _fallback_text_bundle(expression: str) -> Dict:
+        """Placeholder card text used when generation fails."""
+        return {
+            "phonetic": "Not available",
+            "examples": [f"Example with '{expression}' not available."],
+            "explanation": f"Explanation for '{expression}' not available.",
+        }
+    
+    async def _find_relevant_image(self, expression: str) -> Optional[Dict]:
+        """Find a relevant image: a local copy first, then an Unsplash photo, then a DALL-E image."""
+        image_path = self._local_image_path(expression)
+        if image_path is not None:
+            return {"image_url": f"/static/img/{image_path.name}"}
+        
+        # Common vocabulary usually has a matching stock photo, which is much faster than DALL-E.
+        # Unsplash requires hotlinking its photos with credit, so they are never downloaded.
+        if self._unsplash_access_key:
+            image = await self._search_unsplash(expression)
+            if image:
+                return image
+        
+        image_url = await self._generate_image(expression)
+        if not image_url:
+            return None
+        
+        # DALL-E URLs expire, so cards point at a local copy when the download works
+        return {"image_url": await self._download_image(image_url, expression)}
+    
+    async def _download_image(self, image_url: str, expression: str) -> str:
+        """Stream an image to local static storage, returning its local URL or the remote one on failure."""
+        key = CardStore.key(expression)
+        # Concurrent downloads of the same image (e.g. a batch and a stream) each write their own
+        # file, which never matches a cache lookup name
+        partial_path = IMAGE_DIR / f".{key}.{uuid.uuid4().hex}.part"
+        try:
+            IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+            async with self._http.stream("GET", image_url) as response:
+                response.raise_for_status()
+                
+                # The file suffix decides the Content-Type it is served with later
+                content_type = response.headers.get("content-type", "").split(";")[0].strip()
+                suffix = IMAGE_SUFFIXES.get(content_type)
+                if suffix is None:
+                    raise ValueError(f"Unexpected image content type {content_type!r}")
+                
+                async with aiofiles.open(partial_path, "wb") as image_file:
+                    async for chunk in response.aiter_bytes():
+                        await image_file.write(chunk)
             
-            return pronunciation_data
+            # Only complete downloads appear under the final name, which counts as a cache hit
+            image_path = partial_path.replace(IMAGE_DIR / f"{key}{suffix}")
+            return f"/static/img/{image_path.name}"
             
-        except Exception as e:
-            print(f"Error getting pronunciation: {e}")
-            return {
-                "phonetic": "Not available",
-            }
+        except Exception:
+            logger.exception("Error downloading image %s", image_url)
+            partial_path.unlink(missing_ok=True)
+            return image_url
     
-    async def _find_relevant_image(self, expression: str) -> Optional[str]:
-        """Generate a relevant image using DALL-E."""
+    async def _search_unsplash(self, expression: str) -> Optional[Dict]:
+        """Search Unsplash for a photo of the expression, with the photographer credit it must be shown with."""
         try:
-            # First, get the literal meaning explained
-            meaning_response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert at explaining English expressions visually. Describe the core meaning in a way that can be drawn."},
-                    {"role": "user", "content": f'Explain "{expression}".'}
-                ],
-                temperature=0.3,
-                max_tokens=100
+            response = await self._http.get(
+                "https://api.unsplash.com/search/photos",
+                params={"query": expression, "per_page": 1},
+                headers={"Authorization": f"Client-ID {self._unsplash_access_key}"}
             )
+            response.raise_for_status()
             
-            visual_meaning = meaning_response.choices[0].message.content.strip()
+            results = orjson.loads(response.content)["results"]
+            if not results:
+                return None
+            
+            photo = results[0]
+            return {
+                "image_url": photo["urls"]["small"],
+                "image_credit": photo["user"]["name"],
+                "image_credit_url": f"{photo['user']['links']['html']}?{UNSPLASH_UTM}"
+            }
             
-            # Create the image prompt using the visual meaning
-            image_prompt = f"""
-            You are an expert at explaining English expressions visually. Please create a picture explaning "{expression}" with a guide to the meaning below:
-            {visual_meaning}
-
-            Style requirements:
-            - Clean lines and simple shapes
-            - No text or words
-            - White or simple background
-            """
+        except Exception:
+            logger.exception("Error searching Unsplash for %r", expression)
+            return None
+    
+    async def _generate_image(self, expression: str) -> Optional[str]:
+        """Generate a relevant image using DALL-E."""
+        try:
+            # DALL-E gets the expression directly rather than waiting on a GPT description of it
+            image_prompt = _IMG_PROMPT_TMPL.format(expression=expression)
+            logger.debug("image_prompt=%s", image_prompt)
             
-            response = await self.openai_client.images.generate(
+            response = await self._call_openai(
+                self.openai_client.images.generate,
                 model="dall-e-2",
                 prompt=image_prompt,
                 size="256x256",
@@ -116,67 +468,10 @@ class EnglishLearningAgent:
             
             return response.data[0].url
             
-        except Exception as e:
-            print(f"Error generating image: {e}")
+        except Exception:
+            logger.exception("Error generating image for %r", expression)
             return None
 
-    async def _generate_usage_examples(self, expression: str) -> List[str]:
-        """Generate contextual examples using OpenAI's GPT model."""
-        prompt = f"""Generate 3 natural, conversational examples using "{expression}".
-        Examples should:
-        - Use everyday situations
-        - Show different contexts
-        - Include informal dialogue
-        - Demonstrate the expression's typical usage
-        
-        Format: Just the examples, one per line."""
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a native American English speaker giving natural examples."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=150
-            )
-            
-            examples = response.choices[0].message.content.strip().split('\n')
-            return [example.strip() for example in examples if example.strip()]
-            
-        except Exception as e:
-            print(f"Error generating examples: {e}")
-            return [f"Example with '{expression}' not available."]
-
-    async def _generate_explanation(self, expression: str) -> str:
-        """Generate a clear explanation of the expression using GPT."""
-        prompt = f"""Explain the meaning of "{expression}" in simple terms.
-        The explanation should:
-        - Be clear and concise
-        - Use simple language
-        - Include key usage notes if relevant
-        - Be suitable for English learners
-        
-        Format: Just the explanation in 1-2 sentences."""
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert English teacher explaining vocabulary to learners."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=100
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            print(f"Error generating explanation: {e}")
-            return f"Explanation for '{expression}' not available."
-
 async def main():
     # Example usage
     agent = EnglishLearningAgent()
@@ -188,12 +483,12 @@ async def main():
         "cavity"
     ]
     
-    for expression in test_expressions:
-        print(f"\nGenerating card for: {expression}")
+    cards = await agent.generate_anki_cards(test_expressions)
+    
+    for card in cards:
+        print(f"\nGenerated card for: {card.expression}")
         print("-" * 50)
         
-        card = await agent.generate_anki_card(expression)
-        
         print(f"Expression: {card.expression}")
         print(f"Phonetic: {card.phonetic}")
         print(f"Explanation: {card.explanation}")
@@ -201,6 +496,10 @@ async def main():
             print(f"- {example}")
         if card.image_url:
             print(f"\nImage URL: {card.image_url}")
+        if card.image_credit:
+            print(f"Photo by {card.image_credit} on Unsplash")
+    
+    await agent.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -1,31 +1,72 @@
-from fastapi import FastAPI, Request, Form
+import orjson
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from fastapi import FastAPI, HTTPException, Request, Form
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from english_learning_agent import EnglishLearningAgent
 
 app = FastAPI()
 
+MAX_BATCH_SIZE = 20
+
 # Mount static files directory
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Initialize templates
-templates = Jinja2Templates(directory="templates")
+# Initialize templates, compiled once and cached on disk, rendered without blocking the event loop
+Path(".jinja_cache").mkdir(exist_ok=True)
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader("templates"),
+    bytecode_cache=FileSystemBytecodeCache(".jinja_cache"),
+    auto_reload=False,
+    autoescape=True,
+    enable_async=True
+))
+
+async def render(request: Request, name: str, context: dict) -> HTMLResponse:
+    template = templates.get_template(name)
+    return HTMLResponse(await template.render_async({"request": request, **context}))
 
 # Initialize the English Learning Agent
 agent = EnglishLearningAgent()
 
+@app.on_event("startup")
+async def warm_up_agent():
+    # Open a connection to the OpenAI API up front so the first card doesn't pay for the TLS handshake;
+    # this is best-effort, so a short timeout and no retries keep it from delaying startup
+    try:
+        await agent.openai_client.with_options(timeout=5, max_retries=0).models.list()
+    except Exception:
+        pass
+
+@app.on_event("shutdown")
+async def close_agent():
+    await agent.aclose()
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return await render(request, "index.html", {})
 
 @app.post("/generate", response_class=HTMLResponse)
 async def generate_card(request: Request, expression: str = Form(...)):
-    card = await agent.generate_anki_card(expression)
-    return templates.TemplateResponse(
-        "card.html", 
-        {
-            "request": request,
-            "card": card
-        }
-    ) 
\ No newline at end of file
+    # The page is returned right away and fills in the card from /generate/stream
+    return await render(request, "card.html", {"expression": expression})
+
+@app.get("/generate/stream")
+async def stream_card(expression: str):
+    async def events():
+        async for event, data in agent.stream_anki_card(expression):
+            yield f"event: {event}\ndata: ".encode() + orjson.dumps(data) + b"\n\n"
+        yield b"event: done\ndata: {}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.post("/generate_batch", response_class=HTMLResponse)
+async def generate_cards(request: Request, expressions: str = Form(...)):
+    expression_list = [expression.strip() for expression in expressions.split(",") if expression.strip()]
+    # Every expression can cost an image generation, so one request can't ask for unbounded work
+    if len(expression_list) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} expressions per batch")
+    cards = await agent.generate_anki_cards(expression_list)
+    return await render(request, "cards.html", {"cards": cards}) 
\ No newline at end of file
@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+class TokenBucket:
+    """Async token bucket that refills continuously up to a per-minute capacity."""
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = capacity_per_minute
+        self.available = capacity_per_minute
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.last_refill) * self.capacity / 60)
+        self.last_refill = now
+
+    async def acquire(self, amount: float = 1):
+        """Wait until `amount` tokens are available and take them."""
+        # A single request larger than the bucket could never be served otherwise
+        amount = min(amount, self.capacity)
+
+        # Waiters are served in order, so a big request can't be starved by small ones
+        async with self._lock:
+            self._refill()
+            while self.available < amount:
+                await asyncio.sleep((amount - self.available) * 60 / self.capacity)
+                self._refill()
+            self.available -= amount